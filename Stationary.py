@@ -1,669 +1,1047 @@
-import streamlit as st
-import sqlite3
-import qrcode
-from io import BytesIO
-from PIL import Image
-from pyzbar.pyzbar import decode
-import datetime
-from fpdf import FPDF
-import hashlib
-import pygit2
-import os
-import shutil
-import tempfile
-
-# GitHub repository details from Streamlit secrets
-try:
-    REPO_OWNER = st.secrets["github"]["repo_owner"]
-    REPO_NAME = st.secrets["github"]["repo_name"]
-    BRANCH = st.secrets["github"]["branch"]
-    GITHUB_TOKEN = st.secrets["github"]["token"]
-    USE_GITHUB = True
-except KeyError as e:
-    st.warning(f"GitHub secrets missing: {e}. Falling back to local database (no persistence across redeployments). Configure [github] secrets in Streamlit Community Cloud for persistence.")
-    REPO_OWNER = "local"
-    REPO_NAME = "local"
-    BRANCH = "main"
-    GITHUB_TOKEN = ""
-    USE_GITHUB = False
-REPO_PATH = "./temp_repo"
-
-# Function to check and update database schema
-def update_db_schema():
-    conn = sqlite3.connect('stationary.db', check_same_thread=False)
-    cur = conn.cursor()
-    # Check and add form_number column to items table
-    cur.execute("PRAGMA table_info(items)")
-    columns = [info[1] for info in cur.fetchall()]
-    if 'form_number' not in columns:
-        try:
-            cur.execute("ALTER TABLE items ADD COLUMN form_number TEXT")
-            cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_form_number ON items(form_number)")
-            conn.commit()
-        except sqlite3.OperationalError as e:
-            st.error(f"Failed to update items schema: {e}")
-    # Check and add is_admin column to users table
-    cur.execute("PRAGMA table_info(users)")
-    columns = [info[1] for info in cur.fetchall()]
-    if 'is_admin' not in columns:
-        try:
-            cur.execute("ALTER TABLE users ADD COLUMN is_admin BOOLEAN DEFAULT 0")
-            conn.commit()
-        except sqlite3.OperationalError as e:
-            st.error(f"Failed to update users schema: {e}")
-    # Ensure default admin user exists
-    admin_password = "Admin123!"
-    password_hash = hashlib.sha256(admin_password.encode()).hexdigest()
-    cur.execute("SELECT * FROM users WHERE username = 'admin'")
-    if cur.fetchone() is None:
-        try:
-            cur.execute("INSERT INTO users (username, password_hash, is_admin) VALUES (?, ?, 1)", 
-                       ("admin", password_hash))
-            conn.commit()
-        except sqlite3.IntegrityError:
-            pass
-    conn.close()
-
-# Clone or pull database from GitHub
-def sync_db_from_github():
-    if not USE_GITHUB:
-        st.info("Using local database. No GitHub sync performed.")
-        return
-    repo_url = f"https://{GITHUB_TOKEN}@github.com/{REPO_OWNER}/{REPO_NAME}.git"
-    db_path = "stationary.db"
-    
-    if os.path.exists(REPO_PATH):
-        shutil.rmtree(REPO_PATH)
-    try:
-        repo = pygit2.clone_repository(repo_url, REPO_PATH)
-    except Exception as e:
-        st.error(f"Failed to clone GitHub repository: {e}. Check your GitHub token and repository details.")
-        st.stop()
-    
-    db_source = os.path.join(REPO_PATH, db_path)
-    if os.path.exists(db_source):
-        shutil.copy(db_source, db_path)
-    else:
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                username TEXT PRIMARY KEY,
-                password_hash TEXT NOT NULL,
-                is_admin BOOLEAN DEFAULT 0
-            )
-        ''')
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                form_number TEXT,
-                name TEXT NOT NULL,
-                shelf INTEGER NOT NULL,
-                row INTEGER NOT NULL,
-                price REAL NOT NULL,
-                stock INTEGER NOT NULL DEFAULT 0,
-                low_stock_threshold INTEGER NOT NULL DEFAULT 10
-            )
-        ''')
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS transactions (
-                trans_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_id INTEGER NOT NULL,
-                trans_date DATE NOT NULL,
-                quantity INTEGER NOT NULL,
-                trans_type TEXT NOT NULL,
-                user TEXT NOT NULL
-            )
-        ''')
-        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_form_number ON items(form_number)")
-        conn.commit()
-        conn.close()
-
-# Commit and push database to GitHub
-def sync_db_to_github():
-    if not USE_GITHUB:
-        st.info("Using local database. No GitHub sync performed.")
-        return
-    db_path = "stationary.db"
-    repo = pygit2.Repository(REPO_PATH)
-    shutil.copy(db_path, os.path.join(REPO_PATH, db_path))
-    
-    index = repo.index
-    index.add(db_path)
-    index.write()
-    
-    author = pygit2.Signature("Stationary App", "app@example.com")
-    committer = author
-    tree = index.write_tree()
-    repo.create_commit(
-        f"refs/heads/{BRANCH}",
-        author,
-        committer,
-        "Update stationary.db",
-        tree,
-        [repo.head.target] if repo.head_is_unborn else [repo.head.target]
-    )
-    
-    remote = repo.remotes["origin"]
-    credentials = pygit2.UserPass(GITHUB_TOKEN, "x-oauth-basic")
-    try:
-        remote.push([f"refs/heads/{BRANCH}"], callbacks=pygit2.RemoteCallbacks(credentials=credentials))
-    except Exception as e:
-        st.error(f"Failed to push database to GitHub: {e}. Check your GitHub token permissions.")
-
-# Sync database and update schema at startup
-sync_db_from_github()
-update_db_schema()
-
-# Connect to SQLite database
-conn = sqlite3.connect('stationary.db', check_same_thread=False)
-cur = conn.cursor()
-
-# Function to hash password
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
-# Function to add a new user
-def add_user(username, password):
-    password_hash = hash_password(password)
-    try:
-        cur.execute("INSERT INTO users (username, password_hash, is_admin) VALUES (?, ?, 0)", (username, password_hash))
-        conn.commit()
-        sync_db_to_github()
-        return True
-    except sqlite3.IntegrityError:
-        return False
-
-# Function to verify user
-def verify_user(username, password):
-    password_hash = hash_password(password)
-    cur.execute("SELECT * FROM users WHERE username = ? AND password_hash = ?", (username, password_hash))
-    return cur.fetchone() is not None
-
-# Function to check if user is admin
-def is_admin_user(username):
-    cur.execute("SELECT is_admin FROM users WHERE username = ?", (username,))
-    result = cur.fetchone()
-    return result and result[0] == 1
-
-# Function to delete a user
-def delete_user(username):
-    try:
-        cur.execute("DELETE FROM users WHERE username = ?", (username,))
-        conn.commit()
-        sync_db_to_github()
-        return True
-    except sqlite3.Error as e:
-        st.error(f"Failed to delete user: {e}")
-        return False
-
-# Function to delete an item
-def delete_item(item_id):
-    try:
-        cur.execute("DELETE FROM items WHERE id = ?", (item_id,))
-        cur.execute("DELETE FROM transactions WHERE item_id = ?", (item_id,))
-        conn.commit()
-        sync_db_to_github()
-        return True
-    except sqlite3.Error as e:
-        st.error(f"Failed to delete item: {e}")
-        return False
-
-# Function to update an item
-def update_item(item_id, form_number, name, shelf, row, price, low_stock_threshold):
-    try:
-        cur.execute("""
-            UPDATE items 
-            SET form_number = ?, name = ?, shelf = ?, row = ?, price = ?, low_stock_threshold = ?
-            WHERE id = ?
-        """, (form_number, name, shelf, row, price, low_stock_threshold, item_id))
-        conn.commit()
-        sync_db_to_github()
-        return True
-    except sqlite3.IntegrityError as e:
-        st.error("Form number already exists. Please use a unique form number.")
-        return False
-    except sqlite3.Error as e:
-        st.error(f"Database error: {e}")
-        return False
-
-# Function to generate QR code for an item
-def generate_qr(item_id):
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
-    qr.add_data(str(item_id))
-    qr.make(fit=True)
-    img = qr.make_image(fill='black', back_color='white')
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    return buf.getvalue()
-
-# Function to add a new item and generate QR
-def add_item(form_number, name, shelf, row, price, initial_stock, low_stock_threshold):
-    try:
-        cur.execute(
-            "INSERT INTO items (form_number, name, shelf, row, price, stock, low_stock_threshold) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (form_number, name, shelf, row, price, initial_stock, low_stock_threshold)
-        )
-        conn.commit()
-        sync_db_to_github()
-        item_id = cur.lastrowid
-        qr_bytes = generate_qr(item_id)
-        return item_id, qr_bytes
-    except sqlite3.IntegrityError:
-        st.error("Item/Form number already exists. Please use a unique number.")
-        return None, None
-
-# Function to update stock and log transaction
-def update_stock(item_id, quantity, user):
-    trans_type = 'add' if quantity > 0 else 'remove'
-    cur.execute("UPDATE items SET stock = stock + ? WHERE id = ?", (quantity, item_id))
-    cur.execute(
-        "INSERT INTO transactions (item_id, trans_date, quantity, trans_type, user) VALUES (?, ?, ?, ?, ?)",
-        (item_id, datetime.date.today(), abs(quantity), trans_type, user)
-    )
-    conn.commit()
-    sync_db_to_github()
-
-# Function to get monthly usage
-def get_monthly_usage(month, year):
-    cur.execute("""
-        SELECT SUM(quantity) FROM transactions 
-        WHERE trans_type = 'remove' 
-        AND strftime('%m', trans_date) = ? 
-        AND strftime('%Y', trans_date) = ?
-    """, (f"{month:02d}", str(year)))
-    usage = cur.fetchone()[0] or 0
-    return usage
-
-# Function to get current stock value
-def get_current_stock_value():
-    cur.execute("SELECT SUM(stock * price) FROM items")
-    value = cur.fetchone()[0] or 0
-    return value
-
-# Function to get low stock items
-def get_low_stock_items():
-    cur.execute("SELECT id, name, stock, low_stock_threshold FROM items WHERE stock < low_stock_threshold")
-    return cur.fetchall()
-
-# Function to search items by name or form_number
-def search_items(search_term):
-    search_term = f"%{search_term}%"
-    cur.execute("PRAGMA table_info(items)")
-    columns = [info[1] for info in cur.fetchall()]
-    if 'form_number' in columns:
-        query = "SELECT id, form_number, name, shelf, row, price, stock, low_stock_threshold FROM items WHERE name LIKE ? OR form_number LIKE ?"
-    else:
-        query = "SELECT id, NULL as form_number, name, shelf, row, price, stock, low_stock_threshold FROM items WHERE name LIKE ?"
-    cur.execute(query, (search_term, search_term) if 'form_number' in columns else (search_term,))
-    return cur.fetchall()
-
-# Function to get all items for report
-def get_all_items():
-    cur.execute("SELECT id, form_number, name, shelf, row, price, stock, low_stock_threshold FROM items")
-    return cur.fetchall()
-
-# Function to generate monthly usage report
-def generate_monthly_report(month, year, usage, value, low_stock_items):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt="Stationary Management Report", ln=1, align='C')
-    pdf.cell(200, 10, txt=f"Month: {month}/{year}", ln=1)
-    pdf.cell(200, 10, txt=f"Monthly Usage (Quantity Removed): {usage}", ln=1)
-    pdf.cell(200, 10, txt=f"Current Stock Value: ${value:.2f}", ln=1)
-    pdf.ln(10)
-    pdf.cell(200, 10, txt="Reorder Reminders (Low Stock Items):", ln=1)
-    if low_stock_items:
-        for item in low_stock_items:
-            pdf.cell(200, 10, txt=f"ID: {item[0]}, Name: {item[1]}, Stock: {item[2]} (Threshold: {item[3]})", ln=1)
-    else:
-        pdf.cell(200, 10, txt="No low stock items.", ln=1)
-    pdf.ln(10)
-    pdf.cell(200, 10, txt="Created by BOC Weerambugedara Team", ln=1, align='C')
-    
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        pdf.output(tmp_file.name)
-        tmp_file.seek(0)
-        pdf_bytes = tmp_file.read()
-    os.unlink(tmp_file.name)
-    return pdf_bytes
-
-# Function to generate all items report
-def generate_all_items_report(items):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt="All Items Report", ln=1, align='C')
-    pdf.cell(200, 10, txt=f"Generated on: {datetime.date.today()}", ln=1)
-    pdf.ln(10)
-    pdf.cell(200, 10, txt="Items List:", ln=1)
-    if items:
-        for item in items:
-            form_number = item[1] if item[1] else "N/A"
-            pdf.cell(200, 10, txt=f"ID: {item[0]}, Form Number: {form_number}, Name: {item[2]}, Shelf: {item[3]}, Row: {item[4]}, Price: ${item[5]:.2f}, Stock: {item[6]}, Threshold: {item[7]}", ln=1)
-    else:
-        pdf.cell(200, 10, txt="No items found.", ln=1)
-    pdf.ln(10)
-    pdf.cell(200, 10, txt="Created by BOC Weerambugedara Team", ln=1, align='C')
-    
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        pdf.output(tmp_file.name)
-        tmp_file.seek(0)
-        pdf_bytes = tmp_file.read()
-    os.unlink(tmp_file.name)
-    return pdf_bytes
-
-# Function to generate PDF with all QR codes
-def generate_qr_pdf():
-    pdf = FPDF()
-    pdf.set_font("Arial", size=12)
-    cur.execute("SELECT id, form_number, name FROM items")
-    items = cur.fetchall()
-    
-    for item in items:
-        item_id, form_number, name = item
-        form_number = form_number if form_number else "N/A"
-        pdf.add_page()
-        pdf.cell(200, 10, txt=f"Item ID: {item_id}, Form Number: {form_number}, Name: {name}", ln=1, align='C')
-        qr_bytes = generate_qr(item_id)
-        with open(f"temp_qr_{item_id}.png", "wb") as f:
-            f.write(qr_bytes)
-        pdf.image(f"temp_qr_{item_id}.png", x=50, y=30, w=100)
-        pdf.cell(200, 10, txt="Created by BOC Weerambugedara Team", ln=1, align='C')
-        os.remove(f"temp_qr_{item_id}.png")
-    
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        pdf.output(tmp_file.name)
-        tmp_file.seek(0)
-        pdf_bytes = tmp_file.read()
-    os.unlink(tmp_file.name)
-    return pdf_bytes
-
-# Streamlit App Layout
-st.title("Stationary Management System")
-
-# Add branding to sidebar
-st.sidebar.markdown(
-    """
-    <div style="text-align: center; font-weight: bold; color: #4CAF50; margin-top: 20px;">
-        Created by BOC Weerambugedara Team
-    </div>
-    """,
-    unsafe_allow_html=True
-)
-
-# Session state for login
-if 'logged_in' not in st.session_state:
-    st.session_state.logged_in = False
-    st.session_state.user = None
-
-if not st.session_state.logged_in:
-    st.header("Login / Register")
-    tab1, tab2 = st.tabs(["Login", "Register"])
-    
-    with tab1:
-        username = st.text_input("Username", key="login_user")
-        password = st.text_input("Password", type="password", key="login_pass")
-        if st.button("Login"):
-            if verify_user(username, password):
-                st.session_state.logged_in = True
-                st.session_state.user = username
-                st.rerun()
-            else:
-                st.error("Invalid username or password.")
-    
-    with tab2:
-        new_username = st.text_input("New Username", key="reg_user")
-        new_password = st.text_input("New Password", type="password", key="reg_pass")
-        if st.button("Register"):
-            if add_user(new_username, new_password):
-                st.success("User registered successfully! Please login.")
-            else:
-                st.error("Username already exists.")
-else:
-    st.sidebar.write(f"Logged in as: {st.session_state.user}")
-    if st.sidebar.button("Logout"):
-        st.session_state.logged_in = False
-        st.session_state.user = None
-        st.rerun()
-
-    # Menu options
-    menu_options = ["Search Items", "Add New Item", "Add Stock", "Remove Stock", "Generate Report", "Reorder Reminders", "QR Code List"]
-    if is_admin_user(st.session_state.user):
-        menu_options.append("Admin Panel")
-    menu = st.sidebar.selectbox("Menu", menu_options)
-
-    if menu == "Search Items":
-        st.header("Search Items")
-        search_term = st.text_input("Search by Name or Form Number")
-        if search_term:
-            items = search_items(search_term)
-            if items:
-                for item in items:
-                    item_id, form_number, name, shelf, row, price, stock, low_stock_threshold = item
-                    form_number = form_number if form_number else "N/A"
-                    st.write(f"ID: {item_id}, Form Number: {form_number}, Name: {name}, Shelf: {shelf}, Row: {row}, Price: ${price:.2f}, Stock: {stock}, Threshold: {low_stock_threshold}")
-                    st.markdown("---")
-            else:
-                st.info("No items found matching the search term.")
-
-    elif menu == "Add New Item":
-        st.header("Add New Item")
-        form_number = st.text_input("Item/Form Number (must be unique)")
-        name = st.text_input("Item Name")
-        shelf = st.number_input("Shelf Number", min_value=1, step=1)
-        row = st.number_input("Row Number", min_value=1, step=1)
-        price = st.number_input("Price per Unit", min_value=0.0, step=0.01)
-        initial_stock = st.number_input("Initial Stock", min_value=0, step=1)
-        low_stock_threshold = st.number_input("Low Stock Threshold", min_value=1, step=1, value=10)
-        
-        if st.button("Add Item"):
-            if form_number and name:
-                item_id, qr_bytes = add_item(form_number, name, shelf, row, price, initial_stock, low_stock_threshold)
-                if item_id:
-                    st.success(f"Item added with ID: {item_id}")
-                    st.write(f"Form Number: {form_number}, Name: {name}, Shelf: {shelf}, Row: {row}, Price: ${price:.2f}, Stock: {initial_stock}, Threshold: {low_stock_threshold}")
-                    st.image(qr_bytes, caption=f"QR Code for Item ID {item_id}", use_container_width=True)
-                    st.download_button(
-                        label="Download QR Code",
-                        data=qr_bytes,
-                        file_name=f"qr_{item_id}_{form_number}_{name}.png",
-                        mime="image/png"
-                    )
-            else:
-                st.error("Please enter both an item/form number and item name.")
-
-    elif menu == "Add Stock" or menu == "Remove Stock":
-        action = "Add" if menu == "Add Stock" else "Remove"
-        st.header(f"{action} Stock")
-        st.write("Use your phone camera to scan the QR code.")
-        img_file = st.camera_input("Scan QR Code")
-        
-        if img_file:
-            img = Image.open(img_file)
-            decoded_objects = decode(img)
-            if decoded_objects:
-                item_id = int(decoded_objects[0].data.decode('utf-8'))
-                st.success(f"Scanned Item ID: {item_id}")
-                
-                cur.execute("SELECT form_number, name, stock FROM items WHERE id = ?", (item_id,))
-                item = cur.fetchone()
-                if item:
-                    form_number, name, stock = item
-                    form_number = form_number if form_number else "N/A"
-                    st.write(f"Form Number: {form_number}, Item: {name}, Current Stock: {stock}")
-                    quantity = st.number_input(f"Quantity to {action}", min_value=1, step=1)
-                    
-                    if st.button(f"Confirm {action}"):
-                        qty = quantity if action == "Add" else -quantity
-                        update_stock(item_id, qty, st.session_state.user)
-                        st.success(f"Stock updated successfully!")
-                else:
-                    st.error("Item not found.")
-            else:
-                st.error("No QR code detected. Try again.")
-
-    elif menu == "Generate Report":
-        st.header("Generate Report")
-        report_type = st.selectbox("Report Type", ["Monthly Usage Report", "All Items Report"])
-        
-        if report_type == "Monthly Usage Report":
-            month = st.number_input("Month (1-12)", min_value=1, max_value=12, step=1)
-            year = st.number_input("Year", min_value=2000, step=1, value=datetime.date.today().year)
-        
-            if st.button("Generate"):
-                usage = get_monthly_usage(month, year)
-                value = get_current_stock_value()
-                low_stock_items = get_low_stock_items()
-                st.write(f"Monthly Usage (Quantity Removed in {month}/{year}): {usage}")
-                st.write(f"Current Stock Value: ${value:.2f}")
-                
-                try:
-                    pdf_bytes = generate_monthly_report(month, year, usage, value, low_stock_items)
-                    st.download_button(
-                        label="Download Monthly Usage Report",
-                        data=pdf_bytes,
-                        file_name=f"monthly_report_{month}_{year}.pdf",
-                        mime="application/pdf"
-                    )
-                except Exception as e:
-                    st.error(f"Failed to generate monthly report: {e}")
-        else:
-            if st.button("Generate"):
-                try:
-                    items = get_all_items()
-                    pdf_bytes = generate_all_items_report(items)
-                    st.download_button(
-                        label="Download All Items Report",
-                        data=pdf_bytes,
-                        file_name=f"all_items_report_{datetime.date.today()}.pdf",
-                        mime="application/pdf"
-                    )
-                except Exception as e:
-                    st.error(f"Failed to generate all items report: {e}")
-
-    elif menu == "Reorder Reminders":
-        st.header("Reorder Reminders")
-        low_stock_items = get_low_stock_items()
-        if low_stock_items:
-            for item in low_stock_items:
-                st.warning(f"ID: {item[0]}, Name: {item[1]}, Stock: {item[2]} (Threshold: {item[3]}) - Reorder now!")
-        else:
-            st.success("No low stock items.")
-
-    elif menu == "QR Code List":
-        st.header("QR Code List")
-        cur.execute("SELECT id, form_number, name, shelf, row, stock FROM items")
-        items = cur.fetchall()
-        
-        if items:
-            st.write("List of all items with QR codes:")
-            for item in items:
-                item_id, form_number, name, shelf, row, stock = item
-                form_number = form_number if form_number else "N/A"
-                st.write(f"ID: {item_id}, Form Number: {form_number}, Name: {name}, Shelf: {shelf}, Row: {row}, Stock: {stock}")
-                qr_bytes = generate_qr(item_id)
-                st.image(qr_bytes, caption=f"QR Code for {name} (ID: {item_id})", width=200)
-                st.download_button(
-                    label=f"Download QR for {name}",
-                    data=qr_bytes,
-                    file_name=f"qr_{item_id}_{form_number}_{name}.png",
-                    mime="image/png"
-                )
-                st.markdown("---")
-            
-            if st.button("Download All QR Codes as PDF"):
-                try:
-                    pdf_bytes = generate_qr_pdf()
-                    st.download_button(
-                        label="Download QR Code PDF",
-                        data=pdf_bytes,
-                        file_name="all_qr_codes.pdf",
-                        mime="application/pdf"
-                    )
-                except Exception as e:
-                    st.error(f"Failed to generate QR code PDF: {e}")
-        else:
-            st.info("No items found in the database.")
-
-    elif menu == "Admin Panel":
-        st.header("Admin Panel")
-        if not is_admin_user(st.session_state.user):
-            st.error("Access denied. You are not an admin.")
-            st.stop()
-
-        tab1, tab2 = st.tabs(["Manage Users", "Manage Items"])
-
-        with tab1:
-            st.subheader("Manage Users")
-            cur.execute("SELECT username, is_admin FROM users")
-            users = cur.fetchall()
-            if users:
-                for user in users:
-                    username, is_admin = user
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        st.write(f"**{username}** - {'Admin' if is_admin else 'Regular User'}")
-                    with col2:
-                        if username != st.session_state.user:
-                            if st.button("Delete", key=f"del_user_{username}"):
-                                if delete_user(username):
-                                    st.success(f"User {username} deleted.")
-                                    st.rerun()
-                        else:
-                            st.write("*Current user*")
-                    st.markdown("---")
-            else:
-                st.info("No users found.")
-
-        with tab2:
-            st.subheader("Edit / Delete Items")
-            items = get_all_items()
-            if not items:
-                st.info("No items in database.")
-            else:
-                for item in items:
-                    item_id, form_number, name, shelf, row, price, stock, threshold = item
-                    form_number = form_number or "N/A"
-                    
-                    with st.expander(f"ID: {item_id} | {form_number} - {name} | Stock: {stock}"):
-                        col1, col2 = st.columns([3, 1])
-                        with col1:
-                            st.write(f"**Current Values:**")
-                            st.write(f"Form Number: `{form_number}` | Shelf: {shelf} | Row: {row}")
-                            st.write(f"Price: ${price:.2f} | Low Stock Threshold: {threshold}")
-                        
-                        with col2:
-                            if st.button("Delete Item", key=f"del_item_{item_id}"):
-                                if delete_item(item_id):
-                                    st.success(f"Item {name} (ID: {item_id}) deleted.")
-                                    st.rerun()
-
-                        st.markdown("**Edit Item**")
-                        with st.form(key=f"edit_form_{item_id}"):
-                            new_form = st.text_input("Form Number", value=form_number if form_number != "N/A" else "", key=f"form_{item_id}")
-                            new_name = st.text_input("Item Name", value=name, key=f"name_{item_id}")
-                            new_shelf = st.number_input("Shelf", min_value=1, value=shelf, key=f"shelf_{item_id}")
-                            new_row = st.number_input("Row", min_value=1, value=row, key=f"row_{item_id}")
-                            new_price = st.number_input("Price", min_value=0.0, step=0.01, value=float(price), key=f"price_{item_id}")
-                            new_threshold = st.number_input("Low Stock Threshold", min_value=1, value=threshold, key=f"thresh_{item_id}")
-                            
-                            if st.form_submit_button("Save Changes"):
-                                if new_form == "":
-                                    st.error("Form number cannot be empty.")
-                                elif update_item(item_id, new_form if new_form else None, new_name, new_shelf, new_row, new_price, new_threshold):
-                                    st.success(f"Item {name} updated successfully!")
-                                    st.rerun()
-                        
-                        # Show new QR code after edit
-                        st.markdown("**Updated QR Code**")
-                        st.image(generate_qr(item_id), caption=f"QR Code for Item ID {item_id}", width=200)
-                        st.download_button(
-                            "Download Updated QR",
-                            data=generate_qr(item_id),
-                            file_name=f"qr_{item_id}_{new_form or form_number}_{name}.png",
-                            mime="image/png",
-                            key=f"dl_qr_{item_id}"
-                        )
-                        st.markdown("---")
+import streamlit as st
+import sqlite3
+from io import BytesIO
+import datetime
+import hashlib
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError, InvalidHash
+import pygit2
+import os
+import shutil
+import tempfile
+import threading
+import time
+import queue
+from contextlib import contextmanager
+
+# GitHub repository details from Streamlit secrets
+try:
+    REPO_OWNER = st.secrets["github"]["repo_owner"]
+    REPO_NAME = st.secrets["github"]["repo_name"]
+    BRANCH = st.secrets["github"]["branch"]
+    GITHUB_TOKEN = st.secrets["github"]["token"]
+    USE_GITHUB = True
+except KeyError as e:
+    st.warning(f"GitHub secrets missing: {e}. Falling back to local database (no persistence across redeployments). Configure [github] secrets in Streamlit Community Cloud for persistence.")
+    REPO_OWNER = "local"
+    REPO_NAME = "local"
+    BRANCH = "main"
+    GITHUB_TOKEN = ""
+    USE_GITHUB = False
+REPO_PATH = "./temp_repo"
+
+# Function to apply performance PRAGMAs to a connection
+def tune_connection(connection):
+    # WAL lets readers run alongside the writer and halves the fsyncs per
+    # commit; synchronous=NORMAL is still durable in WAL mode.
+    connection.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-65536;
+        PRAGMA mmap_size=268435456;
+        PRAGMA busy_timeout=5000;
+    """)
+
+# Dedicated connection for the background threads. sqlite3 transactions are
+# per-connection, so the write worker must not share `conn` with the request
+# threads: a request-thread commit landing mid-batch would commit a
+# half-applied batch. Opened lazily so it connects only after the startup
+# sync has put the database file in place.
+_bg_conn = None
+_bg_conn_lock = threading.Lock()
+
+def get_bg_conn():
+    global _bg_conn
+    with _bg_conn_lock:
+        if _bg_conn is None:
+            _bg_conn = sqlite3.connect('stationary.db', check_same_thread=False, cached_statements=256)
+            tune_connection(_bg_conn)
+        return _bg_conn
+
+# Argon2 hasher tuned for ~100ms per verify; the encoded hash embeds its own
+# random salt and cost parameters, so no extra salt column is needed
+ph = PasswordHasher(time_cost=3, memory_cost=64 * 1024, parallelism=2)
+
+# Verified against when a username doesn't exist, so a failed login costs the
+# same whether or not the account is real (no username-existence timing leak);
+# cached as a resource because an Argon2 hash costs ~100ms and script reruns
+# would otherwise recompute it on every interaction
+@st.cache_resource
+def get_dummy_hash():
+    return ph.hash("dummy-password")
+
+# Function to hash password
+def hash_password(password):
+    return ph.hash(password)
+
+# Hot statements as module-level constants: sqlite3's per-connection
+# statement cache is keyed by exact SQL text, so reusing one interned string
+# guarantees prepared-statement reuse across calls
+SQL_UPDATE_STOCK = "UPDATE items SET stock = stock + ? WHERE id = ?"
+SQL_INSERT_TRANSACTION = ("INSERT INTO transactions (item_id, trans_date, quantity, trans_type, user) "
+                          "VALUES (?, DATE('now', 'localtime'), ?, ?, ?)")
+SQL_INSERT_ITEM = ("INSERT INTO items (form_number, name, shelf, row, price, stock, low_stock_threshold) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?)")
+SQL_SELECT_LOW_STOCK = "SELECT id, name, stock, low_stock_threshold FROM items WHERE stock < low_stock_threshold"
+
+# Schema DDL, applied once per startup; every statement is idempotent so it
+# is a no-op on an existing database
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        password_hash TEXT NOT NULL,
+        is_admin BOOLEAN DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        form_number TEXT,
+        name TEXT NOT NULL,
+        shelf INTEGER NOT NULL,
+        row INTEGER NOT NULL,
+        price REAL NOT NULL,
+        stock INTEGER NOT NULL DEFAULT 0,
+        low_stock_threshold INTEGER NOT NULL DEFAULT 10
+    );
+    CREATE TABLE IF NOT EXISTS transactions (
+        trans_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_id INTEGER NOT NULL,
+        trans_date DATE NOT NULL,
+        quantity INTEGER NOT NULL,
+        trans_type TEXT NOT NULL,
+        user TEXT NOT NULL
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_form_number ON items(form_number);
+    CREATE INDEX IF NOT EXISTS idx_trans_date_type ON transactions(trans_type, trans_date);
+    CREATE INDEX IF NOT EXISTS idx_items_low ON items(id) WHERE stock < low_stock_threshold;
+"""
+
+# Function to create tables and indexes
+def init_schema(connection):
+    connection.executescript(SCHEMA_SQL)
+    connection.commit()
+
+# Schema for the trigger-maintained stock-value summary: keeps a running
+# SUM(stock * price) so the stock-value report reads one row instead of
+# scanning the items table
+SUMMARY_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS summary (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total_value REAL NOT NULL DEFAULT 0
+    );
+    CREATE TRIGGER IF NOT EXISTS trg_summary_item_insert AFTER INSERT ON items BEGIN
+        UPDATE summary SET total_value = total_value + NEW.stock * NEW.price WHERE id = 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_summary_item_update AFTER UPDATE OF stock, price ON items BEGIN
+        UPDATE summary SET total_value = total_value + NEW.stock * NEW.price - OLD.stock * OLD.price WHERE id = 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_summary_item_delete AFTER DELETE ON items BEGIN
+        UPDATE summary SET total_value = total_value - OLD.stock * OLD.price WHERE id = 1;
+    END;
+"""
+
+# Function to create the summary table/triggers and reseed the running total
+# from items so it can't drift across restarts or out-of-band edits
+def init_summary(connection):
+    connection.executescript(SUMMARY_SCHEMA_SQL)
+    connection.execute("INSERT OR IGNORE INTO summary (id, total_value) VALUES (1, 0)")
+    connection.execute("UPDATE summary SET total_value = (SELECT COALESCE(SUM(stock * price), 0) FROM items)")
+    connection.commit()
+
+# Function to check and update database schema
+def update_db_schema():
+    conn = sqlite3.connect('stationary.db', check_same_thread=False)
+    tune_connection(conn)
+    init_schema(conn)
+    cur = conn.cursor()
+    # The partial index in SCHEMA_SQL supersedes this one: a column-to-column
+    # comparison can't seek a plain composite index
+    cur.execute("DROP INDEX IF EXISTS idx_items_lowstock")
+    # Check and add form_number column to items table
+    cur.execute("PRAGMA table_info(items)")
+    columns = [info[1] for info in cur.fetchall()]
+    if 'form_number' not in columns:
+        try:
+            cur.execute("ALTER TABLE items ADD COLUMN form_number TEXT")
+            cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_form_number ON items(form_number)")
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            st.error(f"Failed to update items schema: {e}")
+    # Check and add is_admin column to users table
+    cur.execute("PRAGMA table_info(users)")
+    columns = [info[1] for info in cur.fetchall()]
+    if 'is_admin' not in columns:
+        try:
+            cur.execute("ALTER TABLE users ADD COLUMN is_admin BOOLEAN DEFAULT 0")
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            st.error(f"Failed to update users schema: {e}")
+    # Keep the stock-value summary in step with the items table
+    init_summary(conn)
+    # Ensure default admin user exists
+    admin_password = "Admin123!"
+    password_hash = hash_password(admin_password)
+    cur.execute("SELECT * FROM users WHERE username = 'admin'")
+    if cur.fetchone() is None:
+        try:
+            cur.execute("INSERT INTO users (username, password_hash, is_admin) VALUES (?, ?, 1)", 
+                       ("admin", password_hash))
+            conn.commit()
+        except sqlite3.IntegrityError:
+            pass
+    conn.close()
+
+# Clone or pull database from GitHub
+def sync_db_from_github():
+    if not USE_GITHUB:
+        st.info("Using local database. No GitHub sync performed.")
+        return
+    repo_url = f"https://{GITHUB_TOKEN}@github.com/{REPO_OWNER}/{REPO_NAME}.git"
+    db_path = "stationary.db"
+
+    if os.path.isdir(os.path.join(REPO_PATH, ".git")):
+        # Reuse the existing clone: fetch and hard-reset to the remote branch
+        # instead of re-downloading the whole history on every start
+        try:
+            repo = pygit2.Repository(REPO_PATH)
+            repo.remotes["origin"].fetch(depth=1)
+            remote_ref = repo.lookup_reference(f"refs/remotes/origin/{BRANCH}")
+            repo.reset(remote_ref.target, pygit2.GIT_RESET_HARD)
+        except Exception as e:
+            st.warning(f"Failed to update existing clone: {e}. Re-cloning.")
+            shutil.rmtree(REPO_PATH)
+    if not os.path.isdir(os.path.join(REPO_PATH, ".git")):
+        try:
+            # Shallow clone: only the latest snapshot of the DB is needed,
+            # not the whole commit history
+            repo = pygit2.clone_repository(repo_url, REPO_PATH, depth=1)
+        except Exception as e:
+            st.error(f"Failed to clone GitHub repository: {e}. Check your GitHub token and repository details.")
+            st.stop()
+    
+    db_source = os.path.join(REPO_PATH, db_path)
+    if os.path.exists(db_source):
+        shutil.copy(db_source, db_path)
+    # When the repo doesn't contain the DB yet, update_db_schema creates it
+    # from SCHEMA_SQL on the main connect path
+
+# Opening a Repository parses refs/config/index from disk each time, so share
+# one handle (and one credentials callback object) across all reruns/sessions
+@st.cache_resource
+def get_repo():
+    return pygit2.Repository(REPO_PATH)
+
+@st.cache_resource
+def get_remote_callbacks():
+    return pygit2.RemoteCallbacks(credentials=pygit2.UserPass(GITHUB_TOKEN, "x-oauth-basic"))
+
+# Commit and push database to GitHub. Returns None on success (or when there
+# is nothing to push) and an error message otherwise: the background worker
+# has no ScriptRunContext, so Streamlit silently drops st.* calls made there,
+# and it's the caller that knows whether it can reach the UI.
+def sync_db_to_github():
+    if not USE_GITHUB:
+        return "Using local database. No GitHub sync performed."
+    db_path = "stationary.db"
+    repo = get_repo()
+    # Flush all WAL pages into the main DB file before reading it, otherwise
+    # the pushed blob would silently miss the most recent commits (which live
+    # in the -wal sidecar that never reaches GitHub). Runs on the background
+    # connection so the sync thread never touches the request threads' conn.
+    get_bg_conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    # Build the commit tree straight from the DB file: one blob write plus a
+    # tree update, with no working-tree copy and no on-disk index churn
+    blob_oid = repo.create_blob_fromdisk(db_path)
+    parent = None if repo.head_is_unborn else repo[repo.head.target]
+    if parent is not None:
+        # Nothing to push when the DB bytes match what's already committed
+        if db_path in parent.tree and parent.tree[db_path].id == blob_oid:
+            return None
+        tree_builder = repo.TreeBuilder(parent.tree)
+    else:
+        tree_builder = repo.TreeBuilder()
+    tree_builder.insert(db_path, blob_oid, pygit2.GIT_FILEMODE_BLOB)
+    tree = tree_builder.write()
+
+    author = pygit2.Signature("Stationary App", "app@example.com")
+    committer = author
+    repo.create_commit(
+        f"refs/heads/{BRANCH}",
+        author,
+        committer,
+        "Update stationary.db",
+        tree,
+        [] if parent is None else [parent.id]
+    )
+
+    remote = repo.remotes["origin"]
+    try:
+        remote.push([f"refs/heads/{BRANCH}"], callbacks=get_remote_callbacks())
+    except Exception as e:
+        return f"Failed to push database to GitHub: {e}. Check your GitHub token permissions."
+    return None
+
+# Background GitHub sync: writers call mark_dirty() instead of pushing inline,
+# and a single daemon thread coalesces bursts of writes into one commit+push
+# so the UI never waits on the network
+SYNC_COALESCE_SECONDS = 5
+_sync_event = threading.Event()
+_sync_lock = threading.Lock()
+
+def mark_dirty():
+    if USE_GITHUB:
+        _sync_event.set()
+
+def _sync_worker():
+    while True:
+        _sync_event.wait()
+        time.sleep(SYNC_COALESCE_SECONDS)
+        _sync_event.clear()
+        try:
+            with _sync_lock:
+                error = sync_db_to_github()
+            if error:
+                print(f"Background GitHub sync failed: {error}")
+            # Fold accumulated WAL pages back into the main DB off the
+            # request path so the -wal file stays bounded
+            get_bg_conn().execute("PRAGMA wal_checkpoint(PASSIVE)")
+        except Exception as e:
+            # Keep the worker alive; the next write re-triggers a push
+            print(f"Background GitHub sync failed: {e}")
+
+# Queue of write batches drained by a single worker thread: stock updates
+# enqueue their statements and return immediately, so the Confirm click never
+# waits on the commit fsync or the GitHub push. Each queue entry is a list of
+# (sql, params) pairs that must commit atomically; the worker additionally
+# folds every batch waiting in the queue into one transaction.
+_write_queue = queue.Queue()
+
+def _write_worker():
+    while True:
+        batches = [_write_queue.get()]
+        while True:
+            try:
+                batches.append(_write_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            # The worker's own connection keeps the batch atomic: on the
+            # shared conn, a request-thread commit could land mid-batch and
+            # persist half of it
+            bg_conn = get_bg_conn()
+            with bg_conn:
+                for batch in batches:
+                    for sql, params in batch:
+                        bg_conn.execute(sql, params)
+        except sqlite3.Error as e:
+            # Keep the worker alive; surfacing is best-effort off-thread
+            print(f"Background write failed: {e}")
+        mark_dirty()
+        # Always acknowledge the drained batches so flush_sync's join()
+        # can't hang on a failed batch
+        for _ in batches:
+            _write_queue.task_done()
+
+# Start exactly one worker of each kind per server process; unguarded, each
+# script rerun would spawn more threads
+@st.cache_resource
+def _start_workers():
+    workers = (threading.Thread(target=_sync_worker, daemon=True),
+               threading.Thread(target=_write_worker, daemon=True))
+    for worker in workers:
+        worker.start()
+    return workers
+
+_start_workers()
+
+# Function to push immediately (sidebar button / logout); runs on the request
+# thread so failures surface in the UI instead of the worker's console log.
+# Returns True when the push succeeded (or there was nothing to do).
+def flush_sync():
+    if not USE_GITHUB:
+        return True
+    # Wait for queued stock writes to land first, so the flush really covers
+    # the user's last confirmed change rather than pushing past it
+    _write_queue.join()
+    _sync_event.clear()
+    with _sync_lock:
+        error = sync_db_to_github()
+    if error:
+        st.error(error)
+        return False
+    return True
+
+# Sync database, update schema, and open the writer connection once per
+# server process: every widget interaction reruns this script top to bottom,
+# and without the resource cache each click would redo the GitHub sync and
+# schema migration
+@st.cache_resource
+def _bootstrap_db():
+    sync_db_from_github()
+    update_db_schema()
+    connection = sqlite3.connect('stationary.db', check_same_thread=False, cached_statements=256)
+    tune_connection(connection)
+    return connection
+
+conn = _bootstrap_db()
+cur = conn.cursor()
+
+# Pool of read-only connections: report and search queries borrow one of
+# these instead of queueing behind the shared writer connection, so WAL
+# readers run concurrently across Streamlit threads
+READ_POOL_SIZE = 4
+
+@st.cache_resource
+def _create_read_pool():
+    pool = queue.Queue()
+    for _ in range(READ_POOL_SIZE):
+        read_conn = sqlite3.connect('file:stationary.db?mode=ro', uri=True, check_same_thread=False, cached_statements=256)
+        tune_connection(read_conn)
+        pool.put(read_conn)
+    return pool
+
+_read_pool = _create_read_pool()
+
+@contextmanager
+def read_connection():
+    connection = _read_pool.get()
+    try:
+        yield connection
+    finally:
+        _read_pool.put(connection)
+
+# Function to add a new user
+def add_user(username, password):
+    password_hash = hash_password(password)
+    try:
+        cur.execute("INSERT INTO users (username, password_hash, is_admin) VALUES (?, ?, 0)", (username, password_hash))
+        conn.commit()
+        mark_dirty()
+        return True
+    except sqlite3.IntegrityError:
+        return False
+
+# Function to verify user
+def verify_user(username, password):
+    cur.execute("SELECT password_hash FROM users WHERE username = ?", (username,))
+    row = cur.fetchone()
+    if row is None:
+        # Burn the same CPU as a real verification before rejecting
+        try:
+            ph.verify(get_dummy_hash(), password)
+        except VerifyMismatchError:
+            pass
+        return False
+    stored_hash = row[0]
+    try:
+        ph.verify(stored_hash, password)
+        return True
+    except (VerifyMismatchError, InvalidHash):
+        # Legacy unsalted SHA-256 hash from before the Argon2 switch:
+        # check the old way and upgrade the stored hash on success
+        if stored_hash == hashlib.sha256(password.encode()).hexdigest():
+            cur.execute("UPDATE users SET password_hash = ? WHERE username = ?",
+                        (hash_password(password), username))
+            conn.commit()
+            return True
+        return False
+
+# Function to check if user is admin
+def is_admin_user(username):
+    cur.execute("SELECT is_admin FROM users WHERE username = ?", (username,))
+    result = cur.fetchone()
+    return result and result[0] == 1
+
+# Function to delete a user
+def delete_user(username):
+    try:
+        cur.execute("DELETE FROM users WHERE username = ?", (username,))
+        conn.commit()
+        mark_dirty()
+        return True
+    except sqlite3.Error as e:
+        st.error(f"Failed to delete user: {e}")
+        return False
+
+# Function to delete an item
+def delete_item(item_id):
+    try:
+        cur.execute("DELETE FROM items WHERE id = ?", (item_id,))
+        cur.execute("DELETE FROM transactions WHERE item_id = ?", (item_id,))
+        conn.commit()
+        mark_dirty()
+        get_low_stock_items.clear()
+        get_current_stock_value.clear()
+        get_monthly_usage.clear()
+        return True
+    except sqlite3.Error as e:
+        st.error(f"Failed to delete item: {e}")
+        return False
+
+# Function to update an item
+def update_item(item_id, form_number, name, shelf, row, price, low_stock_threshold):
+    try:
+        cur.execute("""
+            UPDATE items 
+            SET form_number = ?, name = ?, shelf = ?, row = ?, price = ?, low_stock_threshold = ?
+            WHERE id = ?
+        """, (form_number, name, shelf, row, price, low_stock_threshold, item_id))
+        conn.commit()
+        mark_dirty()
+        get_low_stock_items.clear()
+        get_current_stock_value.clear()
+        return True
+    except sqlite3.IntegrityError as e:
+        st.error("Form number already exists. Please use a unique form number.")
+        return False
+    except sqlite3.Error as e:
+        st.error(f"Database error: {e}")
+        return False
+
+# Function to generate QR code for an item
+# The payload is just the item id, so the PNG is deterministic and cacheable
+# across all sessions; low error correction and light zlib compression keep
+# the encode cheap, and max_entries bounds cache growth
+@st.cache_data(max_entries=1024)
+def generate_qr(item_id):
+    # segno encodes QR matrices much faster than qrcode and writes the PNG
+    # itself, skipping the PIL image round-trip entirely; imported lazily so
+    # sessions that never render a QR skip the import cost
+    import segno
+    buf = BytesIO()
+    segno.make(str(item_id), error='l').save(buf, kind='png', scale=6, border=5)
+    return buf.getvalue()
+
+# Function to decode a single frame
+# OpenCV's dedicated QR detector is ~2-3x faster than ZBar for QR-only input
+# (grayscale input skips its internal color conversion); pyzbar stays as a
+# fallback for frames OpenCV can't read
+def _decode_qr_frame(img):
+    # cv2/numpy/pyzbar dlopen large native libraries; import them only when
+    # a frame actually needs decoding
+    import cv2
+    import numpy as np
+    from pyzbar.pyzbar import decode
+    data, _, _ = cv2.QRCodeDetector().detectAndDecode(np.array(img.convert('L')))
+    if data:
+        return data
+    decoded_objects = decode(img)
+    if decoded_objects:
+        return decoded_objects[0].data.decode('utf-8')
+    return None
+
+# Function to decode a QR code from a PIL image
+# Camera frames arrive at multi-megapixel sizes but decode time is linear in
+# pixel count and a QR survives heavy downscaling, so try small copies first
+# and only fall back to the full-resolution frame if nothing is found
+def decode_qr(img):
+    from PIL import Image
+    for max_size in (800, 1200):
+        if max(img.size) <= max_size:
+            break
+        scaled = img.copy()
+        scaled.thumbnail((max_size, max_size), Image.BILINEAR)
+        data = _decode_qr_frame(scaled)
+        if data:
+            return data
+    return _decode_qr_frame(img)
+
+# Function to add a new item and generate QR
+def add_item(form_number, name, shelf, row, price, initial_stock, low_stock_threshold):
+    try:
+        cur.execute(
+            SQL_INSERT_ITEM,
+            (form_number, name, shelf, row, price, initial_stock, low_stock_threshold)
+        )
+        conn.commit()
+        mark_dirty()
+        get_low_stock_items.clear()
+        get_current_stock_value.clear()
+        item_id = cur.lastrowid
+        qr_bytes = generate_qr(item_id)
+        return item_id, qr_bytes
+    except sqlite3.IntegrityError:
+        st.error("Item/Form number already exists. Please use a unique number.")
+        return None, None
+
+# Function to add many items in one transaction (e.g. a future CSV import);
+# executemany inside a single commit pays one fsync for the whole batch
+def bulk_add_items(rows):
+    try:
+        with conn:
+            cur.executemany(SQL_INSERT_ITEM, rows)
+    except sqlite3.IntegrityError:
+        st.error("Item/Form number already exists. Please use unique numbers.")
+        return False
+    mark_dirty()
+    get_low_stock_items.clear()
+    get_current_stock_value.clear()
+    return True
+
+# Function to update stock and log transaction
+def update_stock(item_id, quantity, user):
+    trans_type = 'add' if quantity > 0 else 'remove'
+    # Fire-and-forget: both statements go to the write worker as one atomic
+    # batch (SQLite stamps the date itself), so the caller returns without
+    # waiting on the commit fsync; the worker marks the DB dirty for the
+    # GitHub sync once the batch lands
+    _write_queue.put([
+        (SQL_UPDATE_STOCK, (quantity, item_id)),
+        (SQL_INSERT_TRANSACTION, (item_id, abs(quantity), trans_type, user)),
+    ])
+    get_low_stock_items.clear()
+    get_current_stock_value.clear()
+    get_monthly_usage.clear()
+
+# Function to apply many stock adjustments in one transaction (for future
+# batch-import flows); rows are (item_id, quantity, user) tuples and the
+# whole batch costs a single commit/fsync
+def bulk_update_stock(rows):
+    with conn:
+        cur.executemany(
+            SQL_UPDATE_STOCK,
+            [(quantity, item_id) for item_id, quantity, _ in rows]
+        )
+        cur.executemany(
+            SQL_INSERT_TRANSACTION,
+            [(item_id, abs(quantity), 'add' if quantity > 0 else 'remove', user)
+             for item_id, quantity, user in rows]
+        )
+    mark_dirty()
+    get_low_stock_items.clear()
+    get_current_stock_value.clear()
+    get_monthly_usage.clear()
+
+# Function to get monthly usage
+@st.cache_data(ttl=300)
+def get_monthly_usage(month, year):
+    # Range predicate on trans_date (instead of strftime) so the
+    # (trans_type, trans_date) index can be used as a range seek
+    # ISO strings compare directly against the stored TEXT dates without
+    # going through sqlite3's date adapter
+    start = datetime.date(year, month, 1).isoformat()
+    end = datetime.date(year + (month == 12), month % 12 + 1, 1).isoformat()
+    with read_connection() as read_conn:
+        row = read_conn.execute("""
+            SELECT SUM(quantity) FROM transactions
+            WHERE trans_type = 'remove'
+            AND trans_date >= ? AND trans_date < ?
+        """, (start, end)).fetchone()
+    return row[0] or 0
+
+# Function to get current stock value
+@st.cache_data(ttl=60)
+def get_current_stock_value():
+    # O(1) read of the trigger-maintained running total
+    with read_connection() as read_conn:
+        row = read_conn.execute("SELECT total_value FROM summary WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+# Function to get low stock items
+@st.cache_data(ttl=30)
+def get_low_stock_items():
+    with read_connection() as read_conn:
+        return read_conn.execute(SQL_SELECT_LOW_STOCK).fetchall()
+
+# Function to search items by name or form_number
+def search_items(search_term):
+    search_term = f"%{search_term}%"
+    with read_connection() as read_conn:
+        columns = [info[1] for info in read_conn.execute("PRAGMA table_info(items)")]
+        if 'form_number' in columns:
+            query = "SELECT id, form_number, name, shelf, row, price, stock, low_stock_threshold FROM items WHERE name LIKE ? OR form_number LIKE ?"
+        else:
+            query = "SELECT id, NULL as form_number, name, shelf, row, price, stock, low_stock_threshold FROM items WHERE name LIKE ?"
+        return read_conn.execute(query, (search_term, search_term) if 'form_number' in columns else (search_term,)).fetchall()
+
+# Function to get all items for report
+def get_all_items():
+    with read_connection() as read_conn:
+        return read_conn.execute("SELECT id, form_number, name, shelf, row, price, stock, low_stock_threshold FROM items").fetchall()
+
+# Function to finalize a PDF: fpdf streams the document straight to the file
+# with no intermediate string buffer, and the bytes are read back once for
+# st.download_button
+def pdf_to_bytes(pdf):
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+        path = tmp_file.name
+    try:
+        pdf.output(path)
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.unlink(path)
+
+# Function to generate monthly usage report
+def generate_monthly_report(month, year, usage, value, low_stock_items):
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, txt="Stationary Management Report", ln=1, align='C')
+    pdf.cell(200, 10, txt=f"Month: {month}/{year}", ln=1)
+    pdf.cell(200, 10, txt=f"Monthly Usage (Quantity Removed): {usage}", ln=1)
+    pdf.cell(200, 10, txt=f"Current Stock Value: ${value:.2f}", ln=1)
+    pdf.ln(10)
+    pdf.cell(200, 10, txt="Reorder Reminders (Low Stock Items):", ln=1)
+    if low_stock_items:
+        # One multi_cell call lays out all rows in a single pass instead of
+        # re-running font/layout work per item
+        lines = "\n".join(
+            f"ID: {item[0]}, Name: {item[1]}, Stock: {item[2]} (Threshold: {item[3]})"
+            for item in low_stock_items
+        )
+        pdf.multi_cell(0, 10, lines)
+    else:
+        pdf.cell(200, 10, txt="No low stock items.", ln=1)
+    pdf.ln(10)
+    pdf.cell(200, 10, txt="Created by BOC Weerambugedara Team", ln=1, align='C')
+    
+    return pdf_to_bytes(pdf)
+
+# Function to generate all items report
+def generate_all_items_report(items):
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, txt="All Items Report", ln=1, align='C')
+    pdf.cell(200, 10, txt=f"Generated on: {datetime.date.today()}", ln=1)
+    pdf.ln(10)
+    pdf.cell(200, 10, txt="Items List:", ln=1)
+    if items:
+        lines = "\n".join(
+            f"ID: {item[0]}, Form Number: {item[1] if item[1] else 'N/A'}, Name: {item[2]}, Shelf: {item[3]}, Row: {item[4]}, Price: ${item[5]:.2f}, Stock: {item[6]}, Threshold: {item[7]}"
+            for item in items
+        )
+        pdf.multi_cell(0, 10, lines)
+    else:
+        pdf.cell(200, 10, txt="No items found.", ln=1)
+    pdf.ln(10)
+    pdf.cell(200, 10, txt="Created by BOC Weerambugedara Team", ln=1, align='C')
+    
+    return pdf_to_bytes(pdf)
+
+# Function to generate PDF with all QR codes
+def generate_qr_pdf():
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.set_font("Arial", size=12)
+    # Iterate the cursor directly: rows are fetched lazily instead of pinning
+    # the whole result set in memory before the first page is written
+    with read_connection() as read_conn:
+        for item_id, form_number, name in read_conn.execute("SELECT id, form_number, name FROM items"):
+            form_number = form_number if form_number else "N/A"
+            pdf.add_page()
+            pdf.cell(200, 10, txt=f"Item ID: {item_id}, Form Number: {form_number}, Name: {name}", ln=1, align='C')
+            # fpdf2 embeds PNGs from a file-like object, so the cached QR bytes
+            # go straight into the page with no temp files on disk
+            pdf.image(BytesIO(generate_qr(item_id)), x=50, y=30, w=100)
+            pdf.cell(200, 10, txt="Created by BOC Weerambugedara Team", ln=1, align='C')
+
+    return pdf_to_bytes(pdf)
+
+# Fragment so interactions inside the QR list (per-item downloads, the PDF
+# button) rerun only this block instead of the whole script
+@st.fragment
+def render_qr_list(items):
+    st.write("List of all items with QR codes:")
+    for item in items:
+        item_id, form_number, name, shelf, row, stock = item
+        form_number = form_number if form_number else "N/A"
+        st.write(f"ID: {item_id}, Form Number: {form_number}, Name: {name}, Shelf: {shelf}, Row: {row}, Stock: {stock}")
+        qr_bytes = generate_qr(item_id)
+        st.image(qr_bytes, caption=f"QR Code for {name} (ID: {item_id})", width=200)
+        st.download_button(
+            label=f"Download QR for {name}",
+            data=qr_bytes,
+            file_name=f"qr_{item_id}_{form_number}_{name}.png",
+            mime="image/png"
+        )
+        st.markdown("---")
+
+    if st.button("Download All QR Codes as PDF"):
+        try:
+            pdf_bytes = generate_qr_pdf()
+            st.download_button(
+                label="Download QR Code PDF",
+                data=pdf_bytes,
+                file_name="all_qr_codes.pdf",
+                mime="application/pdf"
+            )
+        except Exception as e:
+            st.error(f"Failed to generate QR code PDF: {e}")
+
+# Streamlit App Layout
+st.title("Stationary Management System")
+
+# Add branding to sidebar
+st.sidebar.markdown(
+    """
+    <div style="text-align: center; font-weight: bold; color: #4CAF50; margin-top: 20px;">
+        Created by BOC Weerambugedara Team
+    </div>
+    """,
+    unsafe_allow_html=True
+)
+
+# Session state for login
+if 'logged_in' not in st.session_state:
+    st.session_state.logged_in = False
+    st.session_state.user = None
+
+if not st.session_state.logged_in:
+    st.header("Login / Register")
+    tab1, tab2 = st.tabs(["Login", "Register"])
+    
+    with tab1:
+        username = st.text_input("Username", key="login_user")
+        password = st.text_input("Password", type="password", key="login_pass")
+        if st.button("Login"):
+            if verify_user(username, password):
+                st.session_state.logged_in = True
+                st.session_state.user = username
+                st.rerun()
+            else:
+                st.error("Invalid username or password.")
+    
+    with tab2:
+        new_username = st.text_input("New Username", key="reg_user")
+        new_password = st.text_input("New Password", type="password", key="reg_pass")
+        if st.button("Register"):
+            if add_user(new_username, new_password):
+                st.success("User registered successfully! Please login.")
+            else:
+                st.error("Username already exists.")
+else:
+    st.sidebar.write(f"Logged in as: {st.session_state.user}")
+    if st.sidebar.button("Logout"):
+        flush_sync()
+        st.session_state.logged_in = False
+        st.session_state.user = None
+        st.rerun()
+    if USE_GITHUB and st.sidebar.button("Sync now"):
+        if flush_sync():
+            st.sidebar.success("Database synced to GitHub.")
+
+    # Menu options
+    menu_options = ["Search Items", "Add New Item", "Add Stock", "Remove Stock", "Generate Report", "Reorder Reminders", "QR Code List"]
+    if is_admin_user(st.session_state.user):
+        menu_options.append("Admin Panel")
+    menu = st.sidebar.selectbox("Menu", menu_options)
+
+    if menu == "Search Items":
+        st.header("Search Items")
+        search_term = st.text_input("Search by Name or Form Number")
+        if search_term:
+            items = search_items(search_term)
+            if items:
+                for item in items:
+                    item_id, form_number, name, shelf, row, price, stock, low_stock_threshold = item
+                    form_number = form_number if form_number else "N/A"
+                    st.write(f"ID: {item_id}, Form Number: {form_number}, Name: {name}, Shelf: {shelf}, Row: {row}, Price: ${price:.2f}, Stock: {stock}, Threshold: {low_stock_threshold}")
+                    st.markdown("---")
+            else:
+                st.info("No items found matching the search term.")
+
+    elif menu == "Add New Item":
+        st.header("Add New Item")
+        # A form batches all the inputs into one rerun on submit instead of
+        # rerunning the whole script per field change
+        with st.form("add_item_form"):
+            form_number = st.text_input("Item/Form Number (must be unique)")
+            name = st.text_input("Item Name")
+            shelf = st.number_input("Shelf Number", min_value=1, step=1)
+            row = st.number_input("Row Number", min_value=1, step=1)
+            price = st.number_input("Price per Unit", min_value=0.0, step=0.01)
+            initial_stock = st.number_input("Initial Stock", min_value=0, step=1)
+            low_stock_threshold = st.number_input("Low Stock Threshold", min_value=1, step=1, value=10)
+            submitted = st.form_submit_button("Add Item")
+
+        if submitted:
+            if form_number and name:
+                item_id, qr_bytes = add_item(form_number, name, shelf, row, price, initial_stock, low_stock_threshold)
+                if item_id:
+                    st.success(f"Item added with ID: {item_id}")
+                    st.write(f"Form Number: {form_number}, Name: {name}, Shelf: {shelf}, Row: {row}, Price: ${price:.2f}, Stock: {initial_stock}, Threshold: {low_stock_threshold}")
+                    st.image(qr_bytes, caption=f"QR Code for Item ID {item_id}", use_container_width=True)
+                    st.download_button(
+                        label="Download QR Code",
+                        data=qr_bytes,
+                        file_name=f"qr_{item_id}_{form_number}_{name}.png",
+                        mime="image/png"
+                    )
+            else:
+                st.error("Please enter both an item/form number and item name.")
+
+    elif menu == "Add Stock" or menu == "Remove Stock":
+        action = "Add" if menu == "Add Stock" else "Remove"
+        st.header(f"{action} Stock")
+        st.write("Use your phone camera to scan the QR code.")
+        img_file = st.camera_input("Scan QR Code")
+        
+        if img_file:
+            from PIL import Image
+            img = Image.open(img_file)
+            qr_data = decode_qr(img)
+            if qr_data:
+                item_id = int(qr_data)
+                st.success(f"Scanned Item ID: {item_id}")
+                
+                cur.execute("SELECT form_number, name, stock FROM items WHERE id = ?", (item_id,))
+                item = cur.fetchone()
+                if item:
+                    form_number, name, stock = item
+                    form_number = form_number if form_number else "N/A"
+                    st.write(f"Form Number: {form_number}, Item: {name}, Current Stock: {stock}")
+                    with st.form("stock_update_form"):
+                        quantity = st.number_input(f"Quantity to {action}", min_value=1, step=1)
+                        confirmed = st.form_submit_button(f"Confirm {action}")
+                    if confirmed:
+                        qty = quantity if action == "Add" else -quantity
+                        update_stock(item_id, qty, st.session_state.user)
+                        st.success(f"Stock updated successfully!")
+                else:
+                    st.error("Item not found.")
+            else:
+                st.error("No QR code detected. Try again.")
+
+    elif menu == "Generate Report":
+        st.header("Generate Report")
+        report_type = st.selectbox("Report Type", ["Monthly Usage Report", "All Items Report"])
+        
+        if report_type == "Monthly Usage Report":
+            month = st.number_input("Month (1-12)", min_value=1, max_value=12, step=1)
+            year = st.number_input("Year", min_value=2000, step=1, value=datetime.date.today().year)
+        
+            if st.button("Generate"):
+                usage = get_monthly_usage(month, year)
+                value = get_current_stock_value()
+                low_stock_items = get_low_stock_items()
+                st.write(f"Monthly Usage (Quantity Removed in {month}/{year}): {usage}")
+                st.write(f"Current Stock Value: ${value:.2f}")
+                
+                try:
+                    pdf_bytes = generate_monthly_report(month, year, usage, value, low_stock_items)
+                    st.download_button(
+                        label="Download Monthly Usage Report",
+                        data=pdf_bytes,
+                        file_name=f"monthly_report_{month}_{year}.pdf",
+                        mime="application/pdf"
+                    )
+                except Exception as e:
+                    st.error(f"Failed to generate monthly report: {e}")
+        else:
+            if st.button("Generate"):
+                try:
+                    items = get_all_items()
+                    pdf_bytes = generate_all_items_report(items)
+                    st.download_button(
+                        label="Download All Items Report",
+                        data=pdf_bytes,
+                        file_name=f"all_items_report_{datetime.date.today()}.pdf",
+                        mime="application/pdf"
+                    )
+                except Exception as e:
+                    st.error(f"Failed to generate all items report: {e}")
+
+    elif menu == "Reorder Reminders":
+        st.header("Reorder Reminders")
+        low_stock_items = get_low_stock_items()
+        if low_stock_items:
+            for item in low_stock_items:
+                st.warning(f"ID: {item[0]}, Name: {item[1]}, Stock: {item[2]} (Threshold: {item[3]}) - Reorder now!")
+        else:
+            st.success("No low stock items.")
+
+    elif menu == "QR Code List":
+        st.header("QR Code List")
+        cur.execute("SELECT id, form_number, name, shelf, row, stock FROM items")
+        items = cur.fetchall()
+
+        if items:
+            render_qr_list(items)
+        else:
+            st.info("No items found in the database.")
+
+    elif menu == "Admin Panel":
+        st.header("Admin Panel")
+        if not is_admin_user(st.session_state.user):
+            st.error("Access denied. You are not an admin.")
+            st.stop()
+
+        tab1, tab2 = st.tabs(["Manage Users", "Manage Items"])
+
+        with tab1:
+            st.subheader("Manage Users")
+            cur.execute("SELECT username, is_admin FROM users")
+            users = cur.fetchall()
+            if users:
+                for user in users:
+                    username, is_admin = user
+                    col1, col2 = st.columns([3, 1])
+                    with col1:
+                        st.write(f"**{username}** - {'Admin' if is_admin else 'Regular User'}")
+                    with col2:
+                        if username != st.session_state.user:
+                            if st.button("Delete", key=f"del_user_{username}"):
+                                if delete_user(username):
+                                    st.success(f"User {username} deleted.")
+                                    st.rerun()
+                        else:
+                            st.write("*Current user*")
+                    st.markdown("---")
+            else:
+                st.info("No users found.")
+
+        with tab2:
+            st.subheader("Edit / Delete Items")
+            items = get_all_items()
+            if not items:
+                st.info("No items in database.")
+            else:
+                for item in items:
+                    item_id, form_number, name, shelf, row, price, stock, threshold = item
+                    form_number = form_number or "N/A"
+                    
+                    with st.expander(f"ID: {item_id} | {form_number} - {name} | Stock: {stock}"):
+                        col1, col2 = st.columns([3, 1])
+                        with col1:
+                            st.write(f"**Current Values:**")
+                            st.write(f"Form Number: `{form_number}` | Shelf: {shelf} | Row: {row}")
+                            st.write(f"Price: ${price:.2f} | Low Stock Threshold: {threshold}")
+                        
+                        with col2:
+                            if st.button("Delete Item", key=f"del_item_{item_id}"):
+                                if delete_item(item_id):
+                                    st.success(f"Item {name} (ID: {item_id}) deleted.")
+                                    st.rerun()
+
+                        st.markdown("**Edit Item**")
+                        with st.form(key=f"edit_form_{item_id}"):
+                            new_form = st.text_input("Form Number", value=form_number if form_number != "N/A" else "", key=f"form_{item_id}")
+                            new_name = st.text_input("Item Name", value=name, key=f"name_{item_id}")
+                            new_shelf = st.number_input("Shelf", min_value=1, value=shelf, key=f"shelf_{item_id}")
+                            new_row = st.number_input("Row", min_value=1, value=row, key=f"row_{item_id}")
+                            new_price = st.number_input("Price", min_value=0.0, step=0.01, value=float(price), key=f"price_{item_id}")
+                            new_threshold = st.number_input("Low Stock Threshold", min_value=1, value=threshold, key=f"thresh_{item_id}")
+                            
+                            if st.form_submit_button("Save Changes"):
+                                if new_form == "":
+                                    st.error("Form number cannot be empty.")
+                                elif update_item(item_id, new_form if new_form else None, new_name, new_shelf, new_row, new_price, new_threshold):
+                                    st.success(f"Item {name} updated successfully!")
+                                    st.rerun()
+                        
+                        # Show new QR code after edit
+                        st.markdown("**Updated QR Code**")
+                        st.image(generate_qr(item_id), caption=f"QR Code for Item ID {item_id}", width=200)
+                        st.download_button(
+                            "Download Updated QR",
+                            data=generate_qr(item_id),
+                            file_name=f"qr_{item_id}_{new_form or form_number}_{name}.png",
+                            mime="image/png",
+                            key=f"dl_qr_{item_id}"
+                        )
+                        st.markdown("---")